@@ -0,0 +1,58 @@
+# cython: language_level=3
+"""
+Caminho nativo para o envio de requisições do cliente.
+
+Chama zmq_send do libzmq diretamente sobre o ponteiro do socket
+(zmq.Socket.underlying), sem passar pela camada Python do pyzmq, e
+libera a GIL durante o envio. O cliente usa este módulo quando ele está
+compilado e cai no caminho Python puro caso contrário (ver
+social_network_client._io_loop).
+
+ATENÇÃO: sockets zmq não são thread-safe e zmq_send roda aqui sem a
+GIL, então estas funções só podem ser chamadas pela thread que é dona
+exclusiva do socket — no cliente, a thread de I/O.
+
+Compilação (requer Cython e os headers do libzmq):
+    python setup.py build_ext --inplace
+"""
+
+
+cdef extern from "zmq.h" nogil:
+    int zmq_send(void *s, const void *buf, size_t n, int flags)
+    int zmq_errno()
+    const char *zmq_strerror(int errnum)
+
+cdef int ZMQ_SNDMORE = 2
+
+
+def send_request_frames(size_t socket_ptr, const unsigned char[::1] payload):
+    """
+    Envia o par de frames [vazio, payload] pelo socket DEALER.
+
+    O frame vazio emula o envelope do REQ, que o balanceador (ROUTER)
+    espera — o mesmo formato do caminho Python puro. Deve ser chamada
+    apenas pela thread dona do socket (ver o aviso no topo do módulo).
+
+    Args:
+        socket_ptr: Ponteiro do socket (zmq.Socket.underlying)
+        payload: Requisição já serializada
+
+    Raises:
+        OSError: Se o libzmq reportar erro no envio (BlockingIOError
+            quando o SNDTIMEO do socket expira)
+    """
+    cdef void *sock = <void *>socket_ptr
+    cdef size_t n = payload.shape[0]
+    cdef const void *buf = NULL
+    cdef int rc
+
+    if n > 0:
+        buf = <const void *>&payload[0]
+
+    with nogil:
+        rc = zmq_send(sock, NULL, 0, ZMQ_SNDMORE)
+        if rc >= 0:
+            rc = zmq_send(sock, buf, n, 0)
+
+    if rc < 0:
+        raise OSError(zmq_errno(), zmq_strerror(zmq_errno()).decode("utf-8"))
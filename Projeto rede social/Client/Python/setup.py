@@ -0,0 +1,25 @@
+# Compila a extensão nativa opcional do cliente:
+#     python setup.py build_ext --inplace
+#
+# Requer o Cython e os headers de desenvolvimento do libzmq
+# (ex.: libzmq3-dev no Debian/Ubuntu). Sem a extensão compilada o
+# cliente continua funcionando pelo caminho Python puro.
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    raise SystemExit("A compilação da extensão nativa requer o Cython instalado")
+
+extensions = [
+    Extension(
+        "_client_fast",
+        ["_client_fast.pyx"],
+        libraries=["zmq"],
+    ),
+]
+
+setup(
+    name="social-network-client-fast",
+    ext_modules=cythonize(extensions),
+)
@@ -2,29 +2,263 @@
 import zmq
 import json
 import sys
+import threading
 import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+try:
+    import orjson
+except ImportError:
+    # orjson é opcional; sem ele o cliente usa o json da biblioteca padrão
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    # msgpack é opcional; necessário apenas quando use_msgpack=True
+    msgpack = None
+
+try:
+    import msgspec
+except ImportError:
+    # msgspec é opcional; sem ele as requisições usam dicts comuns
+    msgspec = None
+
+try:
+    import _client_fast
+except ImportError:
+    # Extensão nativa opcional (compilada via setup.py); sem ela o
+    # envio usa o caminho Python do pyzmq
+    _client_fast = None
+
+if msgspec is not None:
+    # Um Struct por ação: a serialização pula a alocação do dict
+    # intermediário e roda em C dentro do msgspec
+
+    class _UserRegisterReq(msgspec.Struct):
+        username: str
+        password: str
+        action: str = "USER_REGISTER"
+
+    class _UserLoginReq(msgspec.Struct):
+        username: str
+        password: str
+        action: str = "USER_LOGIN"
+
+    class _CreatePostReq(msgspec.Struct):
+        username: str
+        content: str
+        action: str = "CREATE_POST"
+
+    class _GetUserPostsReq(msgspec.Struct):
+        username: str
+        action: str = "GET_USER_POSTS"
+
+    class _GetFeedReq(msgspec.Struct):
+        username: str
+        limit: int
+        action: str = "GET_FEED"
+
+    class _FollowUserReq(msgspec.Struct):
+        followerUsername: str
+        followedUsername: str
+        action: str = "FOLLOW_USER"
+
+    class _UnfollowUserReq(msgspec.Struct):
+        followerUsername: str
+        followedUsername: str
+        action: str = "UNFOLLOW_USER"
+
+    class _GetFollowersReq(msgspec.Struct):
+        username: str
+        action: str = "GET_FOLLOWERS"
+
+    class _GetFollowingReq(msgspec.Struct):
+        username: str
+        action: str = "GET_FOLLOWING"
+
+    class _SendMessageReq(msgspec.Struct):
+        senderUsername: str
+        receiverUsername: str
+        content: str
+        action: str = "SEND_MESSAGE"
+
+    class _GetConversationReq(msgspec.Struct):
+        username1: str
+        username2: str
+        action: str = "GET_CONVERSATION"
+
+    class _GetUnreadMessagesReq(msgspec.Struct):
+        username: str
+        action: str = "GET_UNREAD_MESSAGES"
+
+    class _MarkAsReadReq(msgspec.Struct):
+        messageId: str
+        username: str
+        action: str = "MARK_AS_READ"
+
+    _REQUEST_STRUCTS = {
+        "USER_REGISTER": _UserRegisterReq,
+        "USER_LOGIN": _UserLoginReq,
+        "CREATE_POST": _CreatePostReq,
+        "GET_USER_POSTS": _GetUserPostsReq,
+        "GET_FEED": _GetFeedReq,
+        "FOLLOW_USER": _FollowUserReq,
+        "UNFOLLOW_USER": _UnfollowUserReq,
+        "GET_FOLLOWERS": _GetFollowersReq,
+        "GET_FOLLOWING": _GetFollowingReq,
+        "SEND_MESSAGE": _SendMessageReq,
+        "GET_CONVERSATION": _GetConversationReq,
+        "GET_UNREAD_MESSAGES": _GetUnreadMessagesReq,
+        "MARK_AS_READ": _MarkAsReadReq,
+    }
+else:
+    _REQUEST_STRUCTS = {}
+
+# Erro de decodificação correspondente à biblioteca em uso
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
+
+# Encoder/decoder do json padrão reutilizados entre as chamadas: as
+# funções de módulo (json.dumps/loads) constroem uma instância nova a
+# cada chamada. ensure_ascii=False mantém acentos como UTF-8 em vez de
+# escapá-los para \uXXXX, o que encolhe o payload e poupa CPU no texto
+# em português típico de posts e mensagens.
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_JSON_DECODE = json.JSONDecoder().decode
+
+# Tempo máximo (em segundos) aguardando a resposta de uma requisição
+REQUEST_TIMEOUT = 5.0
 
 class SocialNetworkClient:
-    def __init__(self, balancer_address="localhost", balancer_port=5000):
+    def __init__(self, balancer_address="localhost", balancer_port=5000, use_msgpack=False):
         """
         Inicializa o cliente da rede social.
-        
+
         Args:
             balancer_address: Endereço do balanceador de carga
             balancer_port: Porta do balanceador
+            use_msgpack: Usa MessagePack no lugar de JSON no protocolo.
+                Requer um balanceador que aceite MessagePack; o padrão
+                continua sendo JSON para manter a compatibilidade.
         """
         self.balancer_address = balancer_address
         self.balancer_port = balancer_port
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.REQ)
+        if use_msgpack and msgpack is None:
+            raise ImportError("use_msgpack=True requer o pacote msgpack instalado")
+        self.use_msgpack = use_msgpack
+
+        # Encoder/decoder do msgspec reutilizados entre as chamadas
+        if msgspec is not None:
+            self._request_encoder = msgspec.json.Encoder()
+            self._response_decoder = msgspec.json.Decoder()
+        else:
+            self._request_encoder = None
+            self._response_decoder = None
+        # Context compartilhado do processo: evita uma thread de I/O do
+        # zmq (e seus buffers) para cada cliente criado
+        self.context = zmq.Context.instance()
+        self.socket = self._create_socket()
         self.connect()
+        self._pipeline = None
+        self._static_request_cache = {}
         self.current_user = None
+
+        # Respostas pendentes, na ordem de envio; o balanceador responde
+        # na mesma ordem, então o casamento é feito por posição na fila
+        self._pending = deque()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reset_requested = threading.Event()
+
+        # Sockets zmq não são thread-safe, então a thread de I/O é a
+        # única dona do socket DEALER; as threads de requisição entregam
+        # os payloads a ela por este par inproc
+        pipe_endpoint = f"inproc://client-send-{uuid.uuid4().hex}"
+        self._send_pipe_out = self.context.socket(zmq.PAIR)
+        self._send_pipe_out.bind(pipe_endpoint)
+        self._send_pipe_in = self.context.socket(zmq.PAIR)
+        self._send_pipe_in.connect(pipe_endpoint)
+
+        self._io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self._io_thread.start()
+
+        # Checagem periódica de mensagens não lidas em segundo plano
+        self.unread_count = 0
+        self._poll_stop = None
+        self._poll_thread = None
         
+    @property
+    def current_user(self):
+        """Usuário logado no momento (None quando deslogado)"""
+        return self._current_user
+
+    @current_user.setter
+    def current_user(self, username):
+        self._current_user = username
+        # O cache de requisições fixas pertence ao usuário logado:
+        # refeito no login, descartado no logout
+        if username:
+            self._build_static_request_cache(username)
+        else:
+            self._static_request_cache = {}
+
+    def _create_socket(self):
+        """Cria o socket DEALER do cliente com uma identidade nova"""
+        # DEALER em vez de REQ: permite manter várias requisições em
+        # trânsito (o REQ trava o ciclo send/recv), então chamadas em
+        # segundo plano não bloqueiam as chamadas do usuário
+        socket = self.context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.IDENTITY, f"client-{uuid.uuid4().hex[:8]}".encode("utf-8"))
+        socket.setsockopt(zmq.LINGER, 0)
+        # Detecta conexões mortas no nível TCP
+        socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        # Envio nunca bloqueia além do timeout da requisição: com o
+        # balanceador inalcançável e a fila cheia o send falha com
+        # zmq.Again e a conexão é recriada, em vez de travar o chamador
+        socket.setsockopt(zmq.SNDTIMEO, int(REQUEST_TIMEOUT * 1000))
+        # O cliente mantém poucas requisições em trânsito; o HWM padrão
+        # de 1000 mensagens só reservaria buffers à toa
+        socket.setsockopt(zmq.SNDHWM, 10)
+        socket.setsockopt(zmq.RCVHWM, 10)
+        # O libzmq já desativa o algoritmo de Nagle por padrão; a opção
+        # explícita só existe em algumas versões do pyzmq
+        if hasattr(zmq, "TCP_NODELAY"):
+            socket.setsockopt(zmq.TCP_NODELAY, 1)
+        return socket
+
     def connect(self):
         """Conecta ao balanceador de carga"""
         connection_string = f"tcp://{self.balancer_address}:{self.balancer_port}"
         print(f"Conectando ao balanceador: {connection_string}")
         self.socket.connect(connection_string)
+
+    def _reset_socket(self, poller):
+        """
+        Recria o socket após uma falha de comunicação.
+
+        Executa apenas na thread de I/O, dona do socket. Sem isso o
+        cliente ficaria preso a uma conexão quebrada (ex.: reinício do
+        balanceador) até o processo reiniciar. A identidade nova garante
+        que respostas atrasadas da conexão anterior sejam descartadas em
+        vez de casadas com a requisição errada. As requisições pendentes
+        são resolvidas com None (viram erro no chamador) e os payloads
+        ainda não enviados são descartados junto, para a fila de
+        pendências e o fio de respostas continuarem alinhados.
+        """
+        self._reset_requested.clear()
+        with self._send_lock:
+            while self._pending:
+                self._pending.popleft().set_result(None)
+            while self._send_pipe_out.poll(0):
+                self._send_pipe_out.recv()
+        poller.unregister(self.socket)
+        self.socket.close()
+        self.socket = self._create_socket()
+        self.connect()
+        poller.register(self.socket, zmq.POLLIN)
         
     def register_user(self, username, password):
         """
@@ -38,13 +272,11 @@ class SocialNetworkClient:
             dict: Resposta do servidor
         """
         # O balanceador deve encaminhar isso para o UserService
-        request = {
-            "action": "USER_REGISTER",  # A ação que o UserService espera
-            "username": username,
-            "password": password
-        }
-        
-        response = self._send_request(request)
+        request = self._make_request("USER_REGISTER",  # A ação que o UserService espera
+                                     username=username, password=password)
+
+        # Nunca via pipeline: o fluxo abaixo depende da resposta na hora
+        response = self._send_request(request, use_pipeline=False)
     
         if response.get("success") and response.get("replication_complete") is False:
             print("Aguardando replicação de dados...")
@@ -64,14 +296,13 @@ class SocialNetworkClient:
             dict: Resposta do servidor
         """
         # O balanceador deve encaminhar isso para o UserService
-        request = {
-            "action": "USER_LOGIN",
-            "username": username,
-            "password": password
-        }
-        
-        response = self._send_request(request)
+        request = self._make_request("USER_LOGIN", username=username, password=password)
+
+        # Nunca via pipeline: current_user é definido com base na resposta
+        response = self._send_request(request, use_pipeline=False)
         if response.get("success", False):
+            # O setter de current_user também pré-codifica as
+            # requisições fixas deste usuário
             self.current_user = username
         return response
     
@@ -89,12 +320,8 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o PostService
-        request = {
-            "action": "CREATE_POST",
-            "username": self.current_user,
-            "content": content
-        }
-        
+        request = self._make_request("CREATE_POST", username=self.current_user, content=content)
+
         return self._send_request(request)
     
     def get_user_posts(self, username=None):
@@ -112,12 +339,14 @@ class SocialNetworkClient:
         
         target_user = username or self.current_user
         
+        # Requisição fixa do usuário logado: usa os bytes pré-codificados
+        payload = self._cached_payload("GET_USER_POSTS", target_user)
+        if payload is not None:
+            return self._send_payload(payload)
+
         # O balanceador deve encaminhar isso para o PostService
-        request = {
-            "action": "GET_USER_POSTS",
-            "username": target_user
-        }
-        
+        request = self._make_request("GET_USER_POSTS", username=target_user)
+
         return self._send_request(request)
     
     def get_feed(self, limit=10):
@@ -134,12 +363,8 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o PostService
-        request = {
-            "action": "GET_FEED",
-            "username": self.current_user,
-            "limit": limit
-        }
-        
+        request = self._make_request("GET_FEED", username=self.current_user, limit=limit)
+
         return self._send_request(request)
     
     def follow_user(self, username_to_follow):
@@ -156,12 +381,10 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o FollowService
-        request = {
-            "action": "FOLLOW_USER",
-            "followerUsername": self.current_user,
-            "followedUsername": username_to_follow
-        }
-        
+        request = self._make_request("FOLLOW_USER",
+                                     followerUsername=self.current_user,
+                                     followedUsername=username_to_follow)
+
         return self._send_request(request)
     
     def unfollow_user(self, username_to_unfollow):
@@ -178,12 +401,10 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o FollowService
-        request = {
-            "action": "UNFOLLOW_USER",
-            "followerUsername": self.current_user,
-            "followedUsername": username_to_unfollow
-        }
-        
+        request = self._make_request("UNFOLLOW_USER",
+                                     followerUsername=self.current_user,
+                                     followedUsername=username_to_unfollow)
+
         return self._send_request(request)
     
     def get_followers(self, username=None):
@@ -201,12 +422,14 @@ class SocialNetworkClient:
         
         target_user = username or self.current_user
         
+        # Requisição fixa do usuário logado: usa os bytes pré-codificados
+        payload = self._cached_payload("GET_FOLLOWERS", target_user)
+        if payload is not None:
+            return self._send_payload(payload)
+
         # O balanceador deve encaminhar isso para o FollowService
-        request = {
-            "action": "GET_FOLLOWERS",
-            "username": target_user
-        }
-        
+        request = self._make_request("GET_FOLLOWERS", username=target_user)
+
         return self._send_request(request)
     
     def get_following(self, username=None):
@@ -224,12 +447,14 @@ class SocialNetworkClient:
         
         target_user = username or self.current_user
         
+        # Requisição fixa do usuário logado: usa os bytes pré-codificados
+        payload = self._cached_payload("GET_FOLLOWING", target_user)
+        if payload is not None:
+            return self._send_payload(payload)
+
         # O balanceador deve encaminhar isso para o FollowService
-        request = {
-            "action": "GET_FOLLOWING",
-            "username": target_user
-        }
-        
+        request = self._make_request("GET_FOLLOWING", username=target_user)
+
         return self._send_request(request)
     
     def send_message(self, receiver_username, content):
@@ -247,13 +472,11 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o MessageService
-        request = {
-            "action": "SEND_MESSAGE",
-            "senderUsername": self.current_user,
-            "receiverUsername": receiver_username,
-            "content": content
-        }
-        
+        request = self._make_request("SEND_MESSAGE",
+                                     senderUsername=self.current_user,
+                                     receiverUsername=receiver_username,
+                                     content=content)
+
         return self._send_request(request)
     
     def get_conversation(self, other_username):
@@ -270,12 +493,10 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o MessageService
-        request = {
-            "action": "GET_CONVERSATION",
-            "username1": self.current_user,
-            "username2": other_username
-        }
-        
+        request = self._make_request("GET_CONVERSATION",
+                                     username1=self.current_user,
+                                     username2=other_username)
+
         return self._send_request(request)
     
     def get_unread_messages(self):
@@ -288,12 +509,14 @@ class SocialNetworkClient:
         if not self.current_user:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
+        # Requisição fixa do usuário logado: usa os bytes pré-codificados
+        payload = self._cached_payload("GET_UNREAD_MESSAGES", self.current_user)
+        if payload is not None:
+            return self._send_payload(payload)
+
         # O balanceador deve encaminhar isso para o MessageService
-        request = {
-            "action": "GET_UNREAD_MESSAGES",
-            "username": self.current_user
-        }
-        
+        request = self._make_request("GET_UNREAD_MESSAGES", username=self.current_user)
+
         return self._send_request(request)
     
     def mark_message_as_read(self, message_id):
@@ -310,45 +533,315 @@ class SocialNetworkClient:
             return {"success": False, "error": "Você precisa fazer login primeiro"}
         
         # O balanceador deve encaminhar isso para o MessageService
-        request = {
-            "action": "MARK_AS_READ",
-            "messageId": message_id,
-            "username": self.current_user
-        }
-        
+        request = self._make_request("MARK_AS_READ", messageId=message_id, username=self.current_user)
+
         return self._send_request(request)
     
-    def _send_request(self, request):
+    def start_unread_polling(self, interval=30):
+        """
+        Inicia a checagem periódica de mensagens não lidas.
+
+        Como o socket DEALER aceita requisições concorrentes, a checagem
+        roda em segundo plano enquanto o usuário digita no menu, sem
+        bloquear as chamadas dele. O total fica em unread_count.
+
+        Args:
+            interval: Intervalo entre as checagens, em segundos
+        """
+        if self._poll_thread is not None:
+            return
+        self._poll_stop = threading.Event()
+        self._poll_thread = threading.Thread(
+            target=self._poll_unread_loop, args=(interval,), daemon=True)
+        self._poll_thread.start()
+
+    def stop_unread_polling(self):
+        """Encerra a checagem periódica de mensagens não lidas"""
+        if self._poll_thread is None:
+            return
+        self._poll_stop.set()
+        self._poll_thread.join()
+        self._poll_stop = None
+        self._poll_thread = None
+        self.unread_count = 0
+
+    def _poll_unread_loop(self, interval):
+        """Atualiza unread_count em segundo plano até ser parado"""
+        while True:
+            response = self.get_unread_messages()
+            if response.get("success"):
+                self.unread_count = response.get("count", 0)
+            if self._poll_stop.wait(interval):
+                break
+
+    def pipeline(self):
+        """
+        Cria um contexto para envio de requisições em lote (pipelining).
+
+        Dentro do contexto, os métodos do cliente apenas enfileiram as
+        requisições e devolvem um Future cada; ao sair do bloco, todas
+        são enviadas de uma vez e as respostas preenchem os Futures.
+        Útil quando várias leituras independentes seriam feitas em
+        sequência (ex.: feed + seguidores + não lidas no login), pois o
+        lote paga uma única ida e volta em vez de uma por requisição.
+
+        Uso:
+            with client.pipeline():
+                feed = client.get_feed()
+                followers = client.get_followers()
+            display_posts(feed.result())
+
+        Returns:
+            RequestPipeline: O contexto de pipeline
+        """
+        return RequestPipeline(self)
+
+    def _send_request(self, request, use_pipeline=True):
         """
         Método privado para enviar requisições ao servidor.
-        
+
         Args:
-            request: Dicionário com a requisição
-            
+            request: Dicionário (ou Struct) com a requisição
+            use_pipeline: Quando False, envia imediatamente mesmo dentro
+                de um bloco pipeline (login/cadastro dependem da
+                resposta na hora, então nunca são enfileirados)
+
         Returns:
-            dict: Resposta do servidor
+            dict: Resposta do servidor (ou Future, dentro de um pipeline)
         """
-        # Converte para JSON e envia
-        request_json = json.dumps(request)
-        # print(f"Enviando requisição: {request_json}")
-        self.socket.send_string(request_json)
-        
-        # Aguarda resposta
-        response_json = self.socket.recv_string()
-        # print(f"Resposta recebida: {response_json}")
-        
+        # Dentro de um pipeline a requisição é apenas enfileirada
+        if use_pipeline and self._pipeline is not None:
+            return self._pipeline._enqueue(request)
+
+        return self._send_payload(self._encode(request))
+
+    def _send_payload(self, request_bytes):
+        """
+        Envia uma requisição já serializada e aguarda a resposta.
+
+        O payload é entregue à thread de I/O pelo par inproc; registrar
+        o Future e entregar sob o mesmo lock garante que a fila de
+        pendências preserve a ordem de envio.
+        """
+        # Se há um reset pendente, aguarda a thread de I/O processá-lo
+        # para esta requisição não ser descartada junto com as antigas
+        while self._reset_requested.is_set() and not self._closed:
+            time.sleep(0.01)
+
+        future = Future()
+        with self._send_lock:
+            self._pending.append(future)
+            self._send_pipe_in.send(request_bytes)
+
+        # Aguarda apenas a resposta desta requisição; outras chamadas
+        # podem enviar e receber em paralelo
+        try:
+            response_bytes = future.result(timeout=REQUEST_TIMEOUT)
+        except FutureTimeout:
+            # Servidor não respondeu: pede à thread de I/O que recrie o
+            # socket para não deixar a conexão em um estado quebrado
+            self._reset_requested.set()
+            return {"success": False, "error": "Tempo esgotado aguardando resposta do servidor"}
+        if response_bytes is None:
+            # Requisição descartada por uma recriação do socket
+            return {"success": False, "error": "Conexão reiniciada durante a requisição"}
+        # print(f"Resposta recebida: {response_bytes}")
+
         # Processa a resposta
         try:
-            response = json.loads(response_json)
-            return response
-        except json.JSONDecodeError:
-            print(f"Erro ao decodificar resposta: {response_json}")
+            return self._decode(response_bytes)
+        except (JSONDecodeError, ValueError):
+            print(f"Erro ao decodificar resposta: {bytes(response_bytes)}")
             return {"success": False, "error": "Erro ao decodificar resposta do servidor"}
+
+    def _io_loop(self):
+        """
+        Thread de I/O, dona exclusiva do socket DEALER.
+
+        Encaminha ao servidor os payloads recebidos pelo par inproc
+        (o frame vazio emula o envelope do REQ, que o balanceador
+        ROUTER espera), entrega as respostas na ordem de envio e recria
+        o socket quando uma falha é sinalizada em _reset_requested.
+        """
+        poller = zmq.Poller()
+        poller.register(self._send_pipe_out, zmq.POLLIN)
+        poller.register(self.socket, zmq.POLLIN)
+
+        while not self._closed:
+            if self._reset_requested.is_set():
+                self._reset_socket(poller)
+
+            events = dict(poller.poll(100))
+
+            if self._send_pipe_out in events:
+                payload = self._send_pipe_out.recv()
+                try:
+                    if _client_fast is not None:
+                        # Extensão nativa: chama zmq_send direto, sem a
+                        # camada Python do pyzmq (seguro aqui porque esta
+                        # thread é a única dona do socket)
+                        _client_fast.send_request_frames(self.socket.underlying, payload)
+                    else:
+                        # copy=False entrega o buffer direto ao libzmq, sem memcpy
+                        self.socket.send_multipart([b"", payload], copy=False, track=False)
+                except (zmq.Again, BlockingIOError):
+                    # Balanceador inalcançável e fila cheia (SNDTIMEO):
+                    # recria a conexão e falha as pendências
+                    self._reset_requested.set()
+                    continue
+
+            if self.socket in events:
+                # copy=False evita copiar a mensagem para fora do libzmq;
+                # a desserialização lê direto do buffer do frame
+                frames = self.socket.recv_multipart(copy=False)
+                with self._send_lock:
+                    if self._pending:
+                        self._pending.popleft().set_result(frames[-1].buffer)
+
+    def _build_static_request_cache(self, username):
+        """
+        Pré-codifica as requisições fixas do usuário logado.
+
+        As ações abaixo sempre carregam o mesmo payload enquanto o
+        usuário estiver logado; codificá-las uma única vez no login
+        zera o custo de serialização dessas chamadas.
+        """
+        self._static_request_cache = {
+            action: self._encode(self._make_request(action, username=username))
+            for action in ("GET_USER_POSTS", "GET_FOLLOWERS",
+                           "GET_FOLLOWING", "GET_UNREAD_MESSAGES")
+        }
+
+    def _cached_payload(self, action, username):
+        """Bytes pré-codificados da requisição, se houver para o usuário"""
+        if self._pipeline is not None or username != self.current_user:
+            return None
+        return self._static_request_cache.get(action)
+
+    def _make_request(self, action, **fields):
+        """
+        Monta uma requisição para a ação dada.
+
+        Com msgspec instalado devolve o Struct tipado da ação, que é
+        serializado sem passar por um dict; caso contrário (ou no modo
+        MessagePack) devolve o dict equivalente.
+        """
+        struct_cls = _REQUEST_STRUCTS.get(action)
+        if struct_cls is not None and not self.use_msgpack:
+            return struct_cls(**fields)
+        request = {"action": action}
+        request.update(fields)
+        return request
+
+    def _encode(self, request):
+        """Serializa uma requisição para bytes no formato do protocolo"""
+        if self.use_msgpack:
+            return msgpack.packb(request, use_bin_type=True)
+        if msgspec is not None:
+            return self._request_encoder.encode(request)
+        if orjson is not None:
+            return orjson.dumps(request)
+        return _JSON_ENCODE(request).encode("utf-8")
+
+    def _decode(self, response_bytes):
+        """Desserializa os bytes de uma resposta do servidor"""
+        if self.use_msgpack:
+            return msgpack.unpackb(response_bytes, raw=False)
+        if msgspec is not None:
+            return self._response_decoder.decode(response_bytes)
+        if orjson is not None:
+            return orjson.loads(response_bytes)
+        # O decoder do json padrão trabalha com str; converte o buffer
+        # dos frames zero-copy antes de decodificar
+        if isinstance(response_bytes, memoryview):
+            response_bytes = response_bytes.tobytes()
+        return _JSON_DECODE(response_bytes.decode("utf-8"))
     
     def close(self):
         """Fecha a conexão com o servidor"""
+        self.stop_unread_polling()
+        self._closed = True
+        self._io_thread.join()
         self.socket.close()
-        self.context.term()
+        self._send_pipe_in.close()
+        self._send_pipe_out.close()
+        # O Context é o compartilhado do processo (zmq.Context.instance());
+        # não é finalizado aqui para não derrubar outros clientes
+
+
+class RequestPipeline:
+    """
+    Agrupa requisições do cliente e as envia em lote por um socket DEALER.
+
+    O socket REQ do cliente exige o ciclo estrito send/recv, o que
+    impede manter várias requisições em trânsito. O pipeline usa um
+    socket DEALER próprio: envia todas as requisições enfileiradas sem
+    aguardar resposta entre elas e só então coleta as respostas. Como o
+    balanceador atende as requisições na ordem de chegada, cada resposta
+    é casada com o Future correspondente pela ordem de envio.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._queued = []  # pares (payload em bytes, Future)
+
+    def __enter__(self):
+        self._client._pipeline = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._client._pipeline = None
+        if exc_type is not None:
+            # Bloco abortado: descarta a fila sem enviar nada
+            for _, future in self._queued:
+                future.cancel()
+            self._queued = []
+            return False
+        self._flush()
+        return False
+
+    def _enqueue(self, request):
+        future = Future()
+        self._queued.append((self._client._encode(request), future))
+        return future
+
+    def _flush(self):
+        if not self._queued:
+            return
+
+        client = self._client
+        socket = client.context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.RCVTIMEO, int(REQUEST_TIMEOUT * 1000))
+        socket.connect(f"tcp://{client.balancer_address}:{client.balancer_port}")
+
+        try:
+            # Envia todo o lote de uma vez (frame vazio emula o envelope REQ)
+            for payload, _ in self._queued:
+                socket.send_multipart([b"", payload], copy=False, track=False)
+
+            # As respostas chegam na ordem de envio. Após um timeout o
+            # casamento por ordem fica comprometido (uma resposta
+            # atrasada seria atribuída à requisição seguinte), então o
+            # restante do lote falha junto.
+            timed_out = False
+            for _, future in self._queued:
+                if timed_out:
+                    future.set_result({"success": False, "error": "Tempo esgotado aguardando resposta do servidor"})
+                    continue
+                try:
+                    frames = socket.recv_multipart(copy=False)
+                except zmq.Again:
+                    timed_out = True
+                    future.set_result({"success": False, "error": "Tempo esgotado aguardando resposta do servidor"})
+                    continue
+                try:
+                    future.set_result(client._decode(frames[-1].buffer))
+                except (JSONDecodeError, ValueError):
+                    future.set_result({"success": False, "error": "Erro ao decodificar resposta do servidor"})
+        finally:
+            self._queued = []
+            socket.close()
 
 
 def display_posts(posts_response):
@@ -365,14 +858,13 @@ def display_posts(posts_response):
         return
     
     print(f"\n=== {count} Publicações ===")
+    divider = "-" * 40
     for post in posts:
-        username = post.get("username")
-        content = post.get("content")
-        created_at = post.get("createdAt")
-        
-        print(f"\n@{username} - {created_at}")
-        print(f"{content}")
-        print("-" * 40)
+        # Indexação direta: o servidor sempre envia esses campos e
+        # post[k] evita o custo do .get por item em feeds grandes
+        print(f"\n@{post['username']} - {post['createdAt']}")
+        print(post["content"])
+        print(divider)
 
 
 def display_messages(messages_response):
@@ -389,16 +881,13 @@ def display_messages(messages_response):
         return
     
     print(f"\n=== {count} Mensagens ===")
+    divider = "-" * 40
     for msg in messages:
-        sender = msg.get("senderUsername")
-        content = msg.get("content")
-        sent_at = msg.get("sentAt")
-        read = msg.get("read", False)
-        
-        status = "[Lida]" if read else "[Não lida]"
-        print(f"\n{status} De: @{sender} - {sent_at}")
-        print(f"{content}")
-        print("-" * 40)
+        # Indexação direta nos campos obrigatórios; só "read" é opcional
+        status = "[Lida]" if msg.get("read", False) else "[Não lida]"
+        print(f"\n{status} De: @{msg['senderUsername']} - {msg['sentAt']}")
+        print(msg["content"])
+        print(divider)
 
 
 def display_users(users_response, relation_type="Seguidores"):
@@ -419,195 +908,254 @@ def display_users(users_response, relation_type="Seguidores"):
         print(f"{i}. @{username}")
 
 
+# Menus pré-montados: uma única escrita no stdout por renderização em
+# vez de um print (e um flush) por linha
+LOGGED_OUT_MENU = "\n".join([
+    "",
+    "===== Rede Social =====",
+    "1. Cadastrar usuário",
+    "2. Fazer login",
+    "0. Encerrar aplicação",
+    "",
+])
+
+LOGGED_IN_MENU = "\n".join([
+    "",
+    "===== Rede Social - Logado como @{user} =====",
+    "{unread}1. Criar publicação",
+    "2. Ver minhas publicações",
+    "3. Ver feed",
+    "4. Seguir usuário",
+    "5. Deixar de seguir usuário",
+    "6. Ver seguidores",
+    "7. Ver quem estou seguindo",
+    "8. Enviar mensagem",
+    "9. Ver mensagens não lidas",
+    "10. Ver conversa com usuário",
+    "11. Ver publicações de outro usuário",
+    "12. Sair da conta",
+    "0. Encerrar aplicação",
+    "",
+])
+
+
+def handle_register(client):
+    """Cadastra um novo usuário"""
+    username = input("Digite o nome de usuário: ")
+    password = input("Digite a senha: ")
+
+    if not username or not password:
+        print("Nome de usuário e senha são obrigatórios!")
+        return
+
+    response = client.register_user(username, password)
+
+    if response.get("success"):
+        print(f"✓ Usuário {response.get('username', username)} cadastrado com sucesso!")
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_login(client):
+    """Faz login no sistema"""
+    username = input("Digite o nome de usuário: ")
+    password = input("Digite a senha: ")
+
+    if not username or not password:
+        print("Nome de usuário e senha são obrigatórios!")
+        return
+
+    response = client.login(username, password)
+
+    if response.get("success"):
+        print(f"✓ Login realizado com sucesso como @{username}!")
+        # Checa mensagens não lidas enquanto o usuário navega
+        client.start_unread_polling(30)
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_create_post(client):
+    """Cria uma nova publicação"""
+    content = input("Digite o conteúdo da publicação: ")
+
+    if not content:
+        print("O conteúdo da publicação é obrigatório!")
+        return
+
+    response = client.create_post(content)
+
+    if response.get("success"):
+        print(f"✓ Publicação criada com sucesso! ID: {response.get('postId')}")
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_my_posts(client):
+    """Exibe as publicações do usuário logado"""
+    display_posts(client.get_user_posts())
+
+
+def handle_feed(client):
+    """Exibe o feed de publicações"""
+    limit = input("Quantas publicações deseja ver? (Enter para padrão 10): ")
+    try:
+        limit = int(limit) if limit else 10
+    except ValueError:
+        limit = 10
+
+    display_posts(client.get_feed(limit))
+
+
+def handle_follow(client):
+    """Segue outro usuário"""
+    username = input("Digite o nome do usuário que deseja seguir: ")
+
+    if not username:
+        print("Nome de usuário é obrigatório!")
+        return
+
+    response = client.follow_user(username)
+
+    if response.get("success"):
+        print(f"✓ Agora você está seguindo @{username}!")
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_unfollow(client):
+    """Deixa de seguir outro usuário"""
+    username = input("Digite o nome do usuário que deseja deixar de seguir: ")
+
+    if not username:
+        print("Nome de usuário é obrigatório!")
+        return
+
+    response = client.unfollow_user(username)
+
+    if response.get("success"):
+        print(f"✓ Você deixou de seguir @{username}!")
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_followers(client):
+    """Exibe os seguidores do usuário logado"""
+    display_users(client.get_followers(), "followers")
+
+
+def handle_following(client):
+    """Exibe quem o usuário logado está seguindo"""
+    display_users(client.get_following(), "following")
+
+
+def handle_send_message(client):
+    """Envia uma mensagem privada"""
+    receiver = input("Digite o nome do usuário destinatário: ")
+    content = input("Digite o conteúdo da mensagem: ")
+
+    if not receiver or not content:
+        print("Destinatário e conteúdo são obrigatórios!")
+        return
+
+    response = client.send_message(receiver, content)
+
+    if response.get("success"):
+        print(f"✓ Mensagem enviada para @{receiver}!")
+    else:
+        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
+
+
+def handle_unread(client):
+    """Exibe as mensagens não lidas"""
+    display_messages(client.get_unread_messages())
+
+
+def handle_conversation(client):
+    """Exibe a conversa com outro usuário"""
+    username = input("Digite o nome do usuário da conversa: ")
+
+    if not username:
+        print("Nome de usuário é obrigatório!")
+        return
+
+    display_messages(client.get_conversation(username))
+
+
+def handle_user_posts(client):
+    """Exibe as publicações de outro usuário"""
+    username = input("Digite o nome do usuário: ")
+
+    if not username:
+        print("Nome de usuário é obrigatório!")
+        return
+
+    display_posts(client.get_user_posts(username))
+
+
+def handle_logout(client):
+    """Sai da conta atual"""
+    print(f"✓ Logout realizado. Até logo, @{client.current_user}!")
+    client.stop_unread_polling()
+    client.current_user = None
+
+
+# Despacho por dicionário: busca O(1) no lugar da cadeia de comparações
+LOGGED_OUT_HANDLERS = {
+    "1": handle_register,
+    "2": handle_login,
+}
+
+LOGGED_IN_HANDLERS = {
+    "1": handle_create_post,
+    "2": handle_my_posts,
+    "3": handle_feed,
+    "4": handle_follow,
+    "5": handle_unfollow,
+    "6": handle_followers,
+    "7": handle_following,
+    "8": handle_send_message,
+    "9": handle_unread,
+    "10": handle_conversation,
+    "11": handle_user_posts,
+    "12": handle_logout,
+}
+
+
 def main():
     # Configuração do balanceador
     balancer_address = "localhost"  # Endereço do balanceador
     balancer_port = 5000            # Porta do balanceador
-    
+
     # Cria o cliente
     client = SocialNetworkClient(balancer_address, balancer_port)
-    
+
     try:
         while True:
             if client.current_user:
-                print(f"\n===== Rede Social - Logado como @{client.current_user} =====")
-                print("1. Criar publicação")
-                print("2. Ver minhas publicações")
-                print("3. Ver feed")
-                print("4. Seguir usuário")
-                print("5. Deixar de seguir usuário")
-                print("6. Ver seguidores")
-                print("7. Ver quem estou seguindo")
-                print("8. Enviar mensagem")
-                print("9. Ver mensagens não lidas")
-                print("10. Ver conversa com usuário")
-                print("11. Ver publicações de outro usuário")
-                print("12. Sair da conta")
-                print("0. Encerrar aplicação")
+                unread = ""
+                if client.unread_count:
+                    unread = f"Você tem {client.unread_count} mensagens não lidas!\n"
+                sys.stdout.write(LOGGED_IN_MENU.format(user=client.current_user, unread=unread))
+                handlers = LOGGED_IN_HANDLERS
             else:
-                print("\n===== Rede Social =====")
-                print("1. Cadastrar usuário")
-                print("2. Fazer login")
-                print("0. Encerrar aplicação")
-            
+                sys.stdout.write(LOGGED_OUT_MENU)
+                handlers = LOGGED_OUT_HANDLERS
+
             choice = input("\nEscolha uma opção: ")
-            
-            # Opções disponíveis sem login
-            if not client.current_user:
-                if choice == "1":  # Cadastrar usuário
-                    username = input("Digite o nome de usuário: ")
-                    password = input("Digite a senha: ")
-                    
-                    if not username or not password:
-                        print("Nome de usuário e senha são obrigatórios!")
-                        continue
-                    
-                    # Tenta registrar o usuário
-                    response = client.register_user(username, password)
-                    
-                    if response.get("success"):
-                        print(f"✓ Usuário {response.get('username', username)} cadastrado com sucesso!")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-                
-                elif choice == "2":  # Fazer login
-                    username = input("Digite o nome de usuário: ")
-                    password = input("Digite a senha: ")
-                    
-                    if not username or not password:
-                        print("Nome de usuário e senha são obrigatórios!")
-                        continue
-                    
-                    # Tenta fazer login
-                    response = client.login(username, password)
-                    
-                    if response.get("success"):
-                        print(f"✓ Login realizado com sucesso como @{username}!")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-            
-            # Opções disponíveis com login
-            else:
-                if choice == "1":  # Criar publicação
-                    content = input("Digite o conteúdo da publicação: ")
-                    
-                    if not content:
-                        print("O conteúdo da publicação é obrigatório!")
-                        continue
-                    
-                    # Tenta criar a publicação
-                    response = client.create_post(content)
-                    
-                    if response.get("success"):
-                        print(f"✓ Publicação criada com sucesso! ID: {response.get('postId')}")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-                
-                elif choice == "2":  # Ver minhas publicações
-                    response = client.get_user_posts()
-                    display_posts(response)
-                
-                elif choice == "3":  # Ver feed
-                    limit = input("Quantas publicações deseja ver? (Enter para padrão 10): ")
-                    try:
-                        limit = int(limit) if limit else 10
-                    except ValueError:
-                        limit = 10
-                    
-                    response = client.get_feed(limit)
-                    display_posts(response)
-                
-                elif choice == "4":  # Seguir usuário
-                    username = input("Digite o nome do usuário que deseja seguir: ")
-                    
-                    if not username:
-                        print("Nome de usuário é obrigatório!")
-                        continue
-                    
-                    # Tenta seguir o usuário
-                    response = client.follow_user(username)
-                    
-                    if response.get("success"):
-                        print(f"✓ Agora você está seguindo @{username}!")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-                
-                elif choice == "5":  # Deixar de seguir usuário
-                    username = input("Digite o nome do usuário que deseja deixar de seguir: ")
-                    
-                    if not username:
-                        print("Nome de usuário é obrigatório!")
-                        continue
-                    
-                    # Tenta deixar de seguir o usuário
-                    response = client.unfollow_user(username)
-                    
-                    if response.get("success"):
-                        print(f"✓ Você deixou de seguir @{username}!")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-                
-                elif choice == "6":  # Ver seguidores
-                    response = client.get_followers()
-                    display_users(response, "followers")
-                
-                elif choice == "7":  # Ver quem estou seguindo
-                    response = client.get_following()
-                    display_users(response, "following")
-                
-                elif choice == "8":  # Enviar mensagem
-                    receiver = input("Digite o nome do usuário destinatário: ")
-                    content = input("Digite o conteúdo da mensagem: ")
-                    
-                    if not receiver or not content:
-                        print("Destinatário e conteúdo são obrigatórios!")
-                        continue
-                    
-                    # Tenta enviar a mensagem
-                    response = client.send_message(receiver, content)
-                    
-                    if response.get("success"):
-                        print(f"✓ Mensagem enviada para @{receiver}!")
-                    else:
-                        print(f"✗ Erro: {response.get('error', 'Erro desconhecido')}")
-                
-                elif choice == "9":  # Ver mensagens não lidas
-                    response = client.get_unread_messages()
-                    display_messages(response)
-                
-                elif choice == "10":  # Ver conversa com usuário
-                    username = input("Digite o nome do usuário da conversa: ")
-                    
-                    if not username:
-                        print("Nome de usuário é obrigatório!")
-                        continue
-                    
-                    response = client.get_conversation(username)
-                    display_messages(response)
-                
-                elif choice == "11":  # Ver publicações de outro usuário
-                    username = input("Digite o nome do usuário: ")
-                    
-                    if not username:
-                        print("Nome de usuário é obrigatório!")
-                        continue
-                    
-                    response = client.get_user_posts(username)
-                    display_posts(response)
-                
-                elif choice == "12":  # Sair da conta
-                    print(f"✓ Logout realizado. Até logo, @{client.current_user}!")
-                    client.current_user = None
-            
-            # Opção disponível em qualquer estado
+
             if choice == "0":
                 print("Encerrando cliente...")
                 break
-            
+
+            handler = handlers.get(choice)
+            if handler is not None:
+                handler(client)
+
             # Pausa para leitura
-            if choice != "0" and client.current_user:
+            if client.current_user:
                 input("\nPressione Enter para continuar...")
-    
+
     finally:
         client.close()
 